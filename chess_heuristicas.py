@@ -1,14 +1,35 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.patches import Rectangle
 from matplotlib.animation import FuncAnimation
 import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 from PIL import Image
 import time
 import pandas as pd
 
 
+HYBRID_WEIGHTS_PATH = "pesos_hibrida.json"
+DEFAULT_HYBRID_WEIGHTS = (0.6, 0.3, 0.1)
+
+# Peças saltadoras (a, b) disponíveis na interface
+LEAPERS = {
+    "Cavalo (1,2)": (1, 2),
+    "Camelo (1,3)": (1, 3),
+    "Zebra (2,3)": (2, 3),
+    "Girafa (1,4)": (1, 4),
+}
+
+
+class _LookaheadInterrupted(Exception):
+    """Sinaliza que o orçamento se esgotou no meio da análise do Backtracking"""
+
+
 class NeuralNetwork:
     """Implementa uma rede neural real com backpropagation"""
 
@@ -106,21 +127,150 @@ class NeuralNetwork:
         return self.forward(X.reshape(1, -1)).flatten()
 
 
+def _hybrid_weights_key(board_size, board_cols, leaper):
+    """Chave do arquivo de pesos: os pesos valem para um tabuleiro e uma peça"""
+    a, b = leaper
+    return f"{board_size}x{board_cols or board_size} ({a},{b})"
+
+
+@lru_cache(maxsize=8)
+def _read_hybrid_weights_file(path):
+    """Lê o arquivo de pesos uma única vez; arquivo ausente ou inválido vira {}"""
+    try:
+        with open(path) as weights_file:
+            weights_by_board = json.load(weights_file)
+    except (OSError, ValueError):
+        return {}
+    return weights_by_board if isinstance(weights_by_board, dict) else {}
+
+
+def load_hybrid_weights(board_size=8, board_cols=None, leaper=(1, 2),
+                        path=HYBRID_WEIGHTS_PATH):
+    """Retorna os pesos otimizados para o tabuleiro e a peça, ou os pesos padrão"""
+    weights = _read_hybrid_weights_file(path).get(
+        _hybrid_weights_key(board_size, board_cols, leaper))
+    try:
+        return (float(weights["acessibilidade"]), float(weights["distancia_borda"]),
+                float(weights["distancia_centro"]))
+    except (KeyError, TypeError, ValueError):
+        return DEFAULT_HYBRID_WEIGHTS
+
+
+@lru_cache(maxsize=32)
+def _hybrid_feature_tables(board_rows, board_cols):
+    """Pré-calcula por casa o termo de centro e a distância das bordas da Híbrida"""
+    rows, cols = np.indices((board_rows, board_cols))
+    center_distance = np.abs(rows - board_rows//2) + \
+        np.abs(cols - board_cols//2)
+    edge_distance = np.minimum.reduce(
+        [rows, cols, board_rows-1-rows, board_cols-1-cols])
+    return (1/(center_distance + 1)).tolist(), edge_distance.tolist()
+
+
+class LeaperGeometry:
+    """Tabelas de movimento de uma peça saltadora (a, b) num tabuleiro m×n
+
+    Calculadas uma única vez por geometria; use get_leaper_geometry para
+    obtê-las do cache compartilhado.
+    """
+
+    def __init__(self, rows, cols, a=1, b=2):
+        self.rows = rows
+        self.cols = cols
+        self.leaper = (a, b)
+
+        # Mesma ordem de deslocamentos do cavalo original, sem repetições
+        offsets = [(b, a), (b, -a), (-b, a), (-b, -a),
+                   (a, b), (a, -b), (-a, b), (-a, -b)]
+        self.offsets = tuple(dict.fromkeys(offsets))
+
+        # neighbors[x][y] lista as casas alcançáveis a partir de (x, y)
+        self.neighbors = tuple(
+            tuple(tuple((x + dx, y + dy) for dx, dy in self.offsets
+                        if 0 <= x + dx < rows and 0 <= y + dy < cols)
+                  for y in range(cols))
+            for x in range(rows))
+
+        # Mesmas tabelas com índices lineares (x * cols + y) e bitmasks
+        self.neighbor_indices = tuple(
+            tuple(move_x * cols + move_y for move_x, move_y in squares)
+            for row in self.neighbors for squares in row)
+        self.neighbor_masks = tuple(sum(1 << square for square in squares)
+                                    for squares in self.neighbor_indices)
+
+        self.symmetries = self._symmetry_permutations()
+
+    def _symmetry_permutations(self):
+        """Simetrias do tabuleiro como permutações de índices
+
+        O conjunto de saltos (a, b) é invariante a rotações e reflexões, então
+        o grupo depende só do formato: 8 elementos no quadrado, 4 no retângulo.
+        """
+        m = self.rows - 1
+        n = self.cols - 1
+        transforms = [
+            lambda x, y: (x, y),
+            lambda x, y: (m - x, n - y),
+            lambda x, y: (x, n - y),
+            lambda x, y: (m - x, y),
+        ]
+        if self.rows == self.cols:
+            transforms += [
+                lambda x, y: (y, m - x),
+                lambda x, y: (m - y, x),
+                lambda x, y: (y, x),
+                lambda x, y: (m - y, m - x),
+            ]
+
+        permutations = []
+        for transform in transforms:
+            permutation = []
+            for x in range(self.rows):
+                for y in range(self.cols):
+                    new_x, new_y = transform(x, y)
+                    permutation.append(new_x * self.cols + new_y)
+            permutations.append(tuple(permutation))
+        return tuple(permutations)
+
+
+@lru_cache(maxsize=64)
+def get_leaper_geometry(rows, cols, a=1, b=2):
+    """Retorna as tabelas de movimento do cache compartilhado (limitado)"""
+    return LeaperGeometry(rows, cols, a, b)
+
+
 class AnimatedKnightTour:
-    def __init__(self, board_size=8):
+    def __init__(self, board_size=8, hybrid_weights=None, board_cols=None,
+                 leaper=(1, 2)):
+        # board_size é o número de linhas; board_cols (padrão: quadrado) o de colunas
         self.board_size = board_size
-        self.board = np.zeros((self.board_size, self.board_size))
+        self.board_cols = board_cols or board_size
+        self.leaper = tuple(leaper)
+        self.geometry = get_leaper_geometry(
+            self.board_size, self.board_cols, *self.leaper)
+        # Pesos da Híbrida: acessibilidade, distância das bordas, termo de centro
+        self.hybrid_weights = hybrid_weights or load_hybrid_weights(
+            self.board_size, self.board_cols, self.leaper)
+        self.board = np.zeros((self.board_size, self.board_cols))
         self.moves_history = []
         self.current_position = None
         self.unreachable_squares = []  # Novas casas não alcançáveis
 
+        # Orçamento de computação (None = sem limite)
+        self.time_budget = None
+        self.node_budget = None
+        self.nodes_expanded = 0
+        self.budget_exhausted = False
+        self._start_time = None
+        self._interruptible = False
+
     def create_board_image(self, current_pos=None, path=None):
         """Cria uma única imagem do tabuleiro"""
         fig, ax = plt.subplots(figsize=(12, 12))
 
         # Desenha o tabuleiro base
         for i in range(self.board_size):
-            for j in range(self.board_size):
+            for j in range(self.board_cols):
                 color = 'white' if (i + j) % 2 == 0 else 'lightgray'
                 ax.add_patch(Rectangle((j, i), 1, 1, facecolor=color))
 
@@ -136,7 +286,7 @@ class AnimatedKnightTour:
         if path and len(path) == len(self.moves_history):
             visited = set((x, y) for x, y in path)
             for i in range(self.board_size):
-                for j in range(self.board_size):
+                for j in range(self.board_cols):
                     if (i, j) not in visited:
                         ax.add_patch(Rectangle((j, i), 1, 1,
                                                facecolor='red', alpha=0.3))
@@ -163,7 +313,7 @@ class AnimatedKnightTour:
             ax.text(y + 0.5, x + 0.5, '♞',
                     ha='center', va='center', color='black', fontsize=40)
 
-        ax.set_xlim(-0.5, self.board_size + 0.5)
+        ax.set_xlim(-0.5, self.board_cols + 0.5)
         ax.set_ylim(-0.5, self.board_size + 0.5)
         plt.axis('off')
 
@@ -182,20 +332,117 @@ class AnimatedKnightTour:
             frames.append(img)
         return frames
 
+    def create_animation_html(self, moves, animation_speed=500, cell_size=48):
+        """Cria um componente HTML/SVG que anima o passeio no navegador
+
+        Envia apenas o tamanho do tabuleiro e a lista de movimentos; o
+        navegador desenha cada quadro localmente a cada animation_speed ms.
+        """
+        width_px = (self.board_cols + 1) * cell_size
+        height_px = (self.board_size + 1) * cell_size
+        return f"""
+        <div style="text-align:center;font-family:sans-serif">
+          <svg id="board" viewBox="{-cell_size} 0 {width_px} {height_px}"
+               style="width:100%;max-width:{width_px}px"></svg>
+          <br><button id="replay">Repetir animação</button>
+        </div>
+        <script>
+        const n = {self.board_size};
+        const m = {self.board_cols};
+        const moves = {json.dumps([[int(x), int(y)] for x, y in moves])};
+        const speed = {int(animation_speed)};
+        const cell = {cell_size};
+        const svg = document.getElementById("board");
+        const ns = "http://www.w3.org/2000/svg";
+
+        // Linha i do tabuleiro é desenhada de baixo para cima, como no matplotlib
+        const px = (col) => (col + 0.5) * cell;
+        const py = (row) => (n - row - 0.5) * cell;
+
+        function el(tag, attrs, text) {{
+          const node = document.createElementNS(ns, tag);
+          for (const [key, value] of Object.entries(attrs)) node.setAttribute(key, value);
+          if (text !== undefined) node.textContent = text;
+          return node;
+        }}
+
+        for (let i = 0; i < n; i++) {{
+          for (let j = 0; j < m; j++) {{
+            svg.appendChild(el("rect", {{
+              x: j * cell, y: (n - i - 1) * cell, width: cell, height: cell,
+              fill: (i + j) % 2 === 0 ? "white" : "lightgray"}}));
+          }}
+          svg.appendChild(el("text", {{x: -cell * 0.3, y: py(i),
+            "text-anchor": "middle", "dominant-baseline": "central",
+            "font-size": cell * 0.3}}, String(n - i)));
+        }}
+        for (let j = 0; j < m; j++) {{
+          const letter = j < 26 ? String.fromCharCode(65 + j) : "A" + (j - 25);
+          svg.appendChild(el("text", {{x: px(j), y: n * cell + cell * 0.4,
+            "text-anchor": "middle", "font-size": cell * 0.3}}, letter));
+        }}
+
+        const path = el("polyline", {{fill: "none", stroke: "blue",
+          "stroke-width": 3, "stroke-opacity": 0.5}});
+        svg.appendChild(path);
+        const layer = el("g", {{}});
+        svg.appendChild(layer);
+
+        function render(step) {{
+          const visited = moves.slice(0, step + 1);
+          path.setAttribute("points",
+            visited.map(([x, y]) => px(y) + "," + py(x)).join(" "));
+          layer.replaceChildren();
+          visited.forEach(([x, y], idx) => layer.appendChild(el("text", {{
+            x: px(y), y: py(x), "text-anchor": "middle",
+            "dominant-baseline": "central", "font-size": cell * 0.3}}, String(idx + 1))));
+
+          // No último quadro, marca as casas não visitadas em vermelho
+          if (step === moves.length - 1) {{
+            const seen = new Set(visited.map(([x, y]) => x * m + y));
+            for (let i = 0; i < n; i++) {{
+              for (let j = 0; j < m; j++) {{
+                if (seen.has(i * m + j)) continue;
+                layer.appendChild(el("rect", {{x: j * cell, y: (n - i - 1) * cell,
+                  width: cell, height: cell, fill: "red", "fill-opacity": 0.3}}));
+                layer.appendChild(el("text", {{x: px(j), y: py(i), fill: "red",
+                  "text-anchor": "middle", "dominant-baseline": "central",
+                  "font-size": cell * 0.5}}, "✗"));
+              }}
+            }}
+          }}
+
+          const [kx, ky] = moves[step];
+          layer.appendChild(el("text", {{x: px(ky), y: py(kx),
+            "text-anchor": "middle", "dominant-baseline": "central",
+            "font-size": cell * 0.8}}, "♞"));
+        }}
+
+        let timer = null;
+        function play() {{
+          clearInterval(timer);
+          let step = 0;
+          render(step);
+          timer = setInterval(() => {{
+            step += 1;
+            if (step >= moves.length) {{ clearInterval(timer); return; }}
+            render(step);
+          }}, speed);
+        }}
+        document.getElementById("replay").addEventListener("click", play);
+        play();
+        </script>
+        """
+
     def get_valid_moves(self, position):
         """Retorna todos os movimentos válidos possíveis da posição atual"""
+        self.nodes_expanded += 1
         x, y = position
         possible_moves = []
-        moves = [
-            (2, 1), (2, -1), (-2, 1), (-2, -1),
-            (1, 2), (1, -2), (-1, 2), (-1, -2)
-        ]
 
-        for dx, dy in moves:
-            new_x, new_y = x + dx, y + dy
-            if 0 <= new_x < self.board_size and 0 <= new_y < self.board_size:
-                if self.board[new_x, new_y] == 0:
-                    possible_moves.append((new_x, new_y))
+        for new_x, new_y in self.geometry.neighbors[x][y]:
+            if self.board[new_x, new_y] == 0:
+                possible_moves.append((new_x, new_y))
 
         return possible_moves
 
@@ -220,6 +467,10 @@ class AnimatedKnightTour:
         if not valid_moves:
             return None
 
+        center_terms, edge_distances = _hybrid_feature_tables(
+            self.board_size, self.board_cols)
+        accessibility_weight, edge_weight, center_weight = self.hybrid_weights
+
         next_moves = []
         for move in valid_moves:
             # 1. Acessibilidade (número de movimentos futuros)
@@ -228,17 +479,15 @@ class AnimatedKnightTour:
             self.board[move[0], move[1]] = 0
 
             # 2. Distância do centro (prefere posições centrais)
-            center_distance = abs(
-                move[0] - self.board_size//2) + abs(move[1] - self.board_size//2)
+            center_term = center_terms[move[0]][move[1]]
 
             # 3. Distância das bordas (evita cantos)
-            edge_distance = min(
-                move[0], move[1], self.board_size-1-move[0], self.board_size-1-move[1])
+            edge_distance = edge_distances[move[0]][move[1]]
 
             # 4. Score baseado em múltiplos fatores
             # Prioriza acessibilidade, depois posições centrais, depois evita bordas
-            score = (accessibility * 0.6) + (edge_distance * 0.3) + \
-                (1/(center_distance + 1) * 0.1)
+            score = (accessibility * accessibility_weight) + \
+                (edge_distance * edge_weight) + (center_term * center_weight)
 
             next_moves.append((score, move))
 
@@ -273,8 +522,15 @@ class AnimatedKnightTour:
 
         return best_move
 
+    def _check_neural_board(self):
+        """A entrada da rede codifica um tabuleiro 8x8 (x * 8 + y)"""
+        if self.board_size > 8 or self.board_cols > 8:
+            raise ValueError("A rede neural cobre apenas tabuleiros de até 8x8!")
+
     def _position_to_input_vector(self, position):
         """Converte posição do tabuleiro em vetor de entrada para a rede neural"""
+        self._check_neural_board()
+
         # Cria vetor de entrada com informações do tabuleiro
         input_vector = np.zeros(64)  # 8x8 = 64 posições
 
@@ -288,9 +544,8 @@ class AnimatedKnightTour:
                 input_vector[visited_x * 8 + visited_y] = 0.5
 
         # Adiciona informações sobre acessibilidade
-        for dx, dy in [(2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2)]:
-            new_x, new_y = x + dx, y + dy
-            if 0 <= new_x < 8 and 0 <= new_y < 8 and self.board[new_x, new_y] == 0:
+        for new_x, new_y in self.geometry.neighbors[x][y]:
+            if new_x < 8 and new_y < 8 and self.board[new_x, new_y] == 0:
                 input_vector[new_x * 8 + new_y] = 0.3
 
         return input_vector
@@ -308,10 +563,90 @@ class AnimatedKnightTour:
         self.board[x, y] = 0
 
         # Score composto: predição da rede + heurística de acessibilidade
-        final_score = base_score * 0.7 + (future_moves / 8.0) * 0.3
+        max_moves = len(self.geometry.offsets)
+        final_score = base_score * 0.7 + (future_moves / max_moves) * 0.3
 
         return final_score
 
+    def solve_neural_tours_batch(self, start_positions):
+        """Executa a heurística Neural a partir de várias casas iniciais em lote
+
+        Os K passeios avançam juntos: a cada passo os tabuleiros codificados
+        são empilhados numa matriz (K x 64) e a rede faz um único forward;
+        os candidatos são filtrados para movimentos legais com operações de
+        array. Equivale a chamar solve_knights_tour(start, "Neural") para
+        cada casa inicial.
+        """
+        # Sem rede treinada a Neural usa a Híbrida; roda passeio a passeio
+        if not hasattr(self, 'neural_network') or not self.neural_network.is_trained:
+            return [list(self.solve_knights_tour(start, "Neural"))
+                    for start in start_positions]
+
+        self._check_neural_board()
+
+        cols = self.board_cols
+        num_squares = self.board_size * cols
+        max_moves = len(self.geometry.offsets)
+
+        # Tabela de vizinhos preenchida com uma casa sentinela sempre visitada
+        sentinel = num_squares
+        neighbor_table = np.full((num_squares + 1, max_moves), sentinel)
+        for square, squares in enumerate(self.geometry.neighbor_indices):
+            neighbor_table[square, :len(squares)] = squares
+
+        # Índice de cada casa no vetor de entrada da rede (x * 8 + y)
+        input_index = np.array([x * 8 + y for x in range(self.board_size)
+                                for y in range(cols)] + [0])
+
+        num_tours = len(start_positions)
+        visited = np.zeros((num_tours, num_squares + 1), dtype=bool)
+        visited[:, sentinel] = True
+        current = np.array([x * cols + y for x, y in start_positions])
+        visited[np.arange(num_tours), current] = True
+        paths = [[tuple(start)] for start in start_positions]
+        active = np.arange(num_tours)
+
+        while active.size:
+            candidates = neighbor_table[current[active]]
+            legal = ~np.take_along_axis(visited[active], candidates, axis=1)
+
+            # Passeios sem movimentos legais terminam aqui
+            has_moves = legal.any(axis=1)
+            active, candidates, legal = \
+                active[has_moves], candidates[has_moves], legal[has_moves]
+            if not active.size:
+                break
+            rows = np.arange(active.size)
+            board_visited = visited[active]
+
+            # Codifica os tabuleiros como em _position_to_input_vector
+            inputs = np.zeros((active.size, 64))
+            inputs[rows, input_index[current[active]]] = 1
+            window = input_index[:num_squares]
+            inputs[:, window] = np.where(
+                board_visited[:, :num_squares], 0.5, inputs[:, window])
+            tour_rows, move_cols = np.nonzero(legal)
+            inputs[tour_rows, input_index[candidates[tour_rows, move_cols]]] = 0.3
+
+            predictions = self.neural_network.forward(inputs)
+
+            # Score como em _calculate_move_score, para todos os candidatos
+            onward = neighbor_table[candidates].reshape(active.size, -1)
+            future_moves = (~np.take_along_axis(board_visited, onward, axis=1)) \
+                .reshape(active.size, max_moves, max_moves).sum(axis=2)
+            base_scores = np.take_along_axis(
+                predictions, input_index[candidates], axis=1)
+            scores = base_scores * 0.7 + (future_moves / max_moves) * 0.3
+            scores[~legal] = -np.inf
+
+            next_squares = candidates[rows, scores.argmax(axis=1)]
+            visited[active, next_squares] = True
+            current[active] = next_squares
+            for tour, square in zip(active, next_squares):
+                paths[tour].append(divmod(int(square), cols))
+
+        return paths
+
     def train_neural_network(self, num_games=1000):
         """Treina a rede neural com dados de jogos"""
         print("Iniciando treinamento da rede neural...")
@@ -320,8 +655,16 @@ class AnimatedKnightTour:
         if not hasattr(self, 'neural_network'):
             self.neural_network = NeuralNetwork()
 
-        # Gera dados de treinamento
-        training_data, target_moves = self._generate_training_data(num_games)
+        # Os jogos de treinamento usam sempre um tabuleiro 8x8 (entrada da rede)
+        board_shape = (self.board_size, self.board_cols, self.geometry)
+        self.board_size, self.board_cols = 8, 8
+        self.geometry = get_leaper_geometry(8, 8, *self.leaper)
+        try:
+            # Gera dados de treinamento
+            training_data, target_moves = self._generate_training_data(num_games)
+        finally:
+            self.board_size, self.board_cols, self.geometry = board_shape
+            self.board = np.zeros((self.board_size, self.board_cols))
 
         # Treina a rede
         self.neural_network.train(training_data, target_moves)
@@ -379,6 +722,10 @@ class AnimatedKnightTour:
         if not valid_moves:
             return None
 
+        return self._backtracking_best_move(valid_moves, depth)
+
+    def _backtracking_best_move(self, valid_moves, depth):
+        """Escolhe o movimento com maior score explorando até a profundidade dada"""
         best_move = None
         best_score = -1
 
@@ -399,6 +746,9 @@ class AnimatedKnightTour:
 
     def _explore_moves_complex(self, position, depth):
         """Função auxiliar para backtracking - Versão mais complexa e realista"""
+        if self._interruptible and self._budget_is_exhausted():
+            raise _LookaheadInterrupted()
+
         if depth == 0:
             # Simula análise mais complexa
             valid_moves = self.get_valid_moves(position)
@@ -442,35 +792,38 @@ class AnimatedKnightTour:
         connectivity_score = 0
 
         # Verifica movimentos em múltiplas direções
-        for dx in [-2, -1, 1, 2]:
-            for dy in [-2, -1, 1, 2]:
-                if abs(dx) + abs(dy) == 3:  # Movimento válido do cavalo
-                    new_x, new_y = position[0] + dx, position[1] + dy
-                    if 0 <= new_x < self.board_size and 0 <= new_y < self.board_size:
-                        if self.board[new_x, new_y] == 0:
-                            connectivity_score += 0.1
+        for new_x, new_y in self.geometry.neighbors[position[0]][position[1]]:
+            if self.board[new_x, new_y] == 0:
+                connectivity_score += 0.1
 
         return connectivity_score
 
-    def solve_knights_tour(self, start_position, heuristic="Warnsdorff"):
-        """Resolve o passeio do cavalo usando a heurística selecionada"""
-        self.board = np.zeros((self.board_size, self.board_size))
+    def _budget_is_exhausted(self):
+        """Verifica se o orçamento total de tempo ou de nós foi consumido"""
+        if self.time_budget is not None and \
+                time.perf_counter() - self._start_time >= self.time_budget:
+            return True
+        if self.node_budget is not None and self.nodes_expanded >= self.node_budget:
+            return True
+        return False
+
+    def _walk(self, start_position, next_move_func):
+        """Percorre o tabuleiro a partir de start_position até travar ou esgotar o orçamento"""
+        self.board = np.zeros((self.board_size, self.board_cols))
         self.current_position = start_position
         self.board[start_position[0], start_position[1]] = 1
         self.moves_history = [start_position]
 
-        heuristic_functions = {
-            "Warnsdorff": self.warnsdorff_next_move,
-            "Híbrida": self.hybrid_next_move,
-            "Neural": self.neural_next_move,
-            "Backtracking": self.backtracking_next_move
-        }
-
-        next_move_func = heuristic_functions.get(
-            heuristic, self.warnsdorff_next_move)
+        while len(self.moves_history) < self.board_size * self.board_cols:
+            if self._budget_is_exhausted():
+                self.budget_exhausted = True
+                break
 
-        while len(self.moves_history) < self.board_size * self.board_size:
-            next_move = next_move_func(self.current_position)
+            try:
+                next_move = next_move_func(self.current_position)
+            except _LookaheadInterrupted:
+                self.budget_exhausted = True
+                break
             if next_move is None:
                 break
 
@@ -480,6 +833,68 @@ class AnimatedKnightTour:
 
         return self.moves_history
 
+    def _restore_tour(self, moves):
+        """Reconstrói o tabuleiro a partir de um passeio já encontrado"""
+        self.board = np.zeros((self.board_size, self.board_cols))
+        for x, y in moves:
+            self.board[x, y] = 1
+        self.moves_history = list(moves)
+        self.current_position = moves[-1]
+
+    def _deepening_backtracking(self, start_position):
+        """Backtracking anytime: repete o passeio com profundidades crescentes
+
+        Cada passeio completo (ou interrompido pelo orçamento) é um candidato;
+        mantém o mais longo e usa o orçamento que sobra para aprofundar a
+        análise, até cobrir o tabuleiro ou esgotar o orçamento.
+        """
+        total_squares = self.board_size * self.board_cols
+        best_tour = [start_position]
+        self._interruptible = True
+        try:
+            for depth in range(1, total_squares):
+                tour = self._walk(
+                    start_position,
+                    lambda position: self.backtracking_next_move(position, depth))
+                if len(tour) > len(best_tour):
+                    best_tour = list(tour)
+                if self.budget_exhausted or len(best_tour) == total_squares:
+                    break
+        finally:
+            self._interruptible = False
+
+        self._restore_tour(best_tour)
+        return self.moves_history
+
+    def solve_knights_tour(self, start_position, heuristic="Warnsdorff",
+                           time_budget=None, node_budget=None):
+        """Resolve o passeio do cavalo usando a heurística selecionada
+
+        time_budget (segundos) e node_budget (expansões de casas) limitam o
+        esforço total; ao esgotar o orçamento, retorna o melhor passeio
+        encontrado até o momento.
+        """
+        self.time_budget = time_budget
+        self.node_budget = node_budget
+        self.nodes_expanded = 0
+        self.budget_exhausted = False
+        self._start_time = time.perf_counter()
+
+        heuristic_functions = {
+            "Warnsdorff": self.warnsdorff_next_move,
+            "Híbrida": self.hybrid_next_move,
+            "Neural": self.neural_next_move,
+            "Backtracking": self.backtracking_next_move
+        }
+
+        if heuristic == "Backtracking" and (time_budget is not None or
+                                            node_budget is not None):
+            return self._deepening_backtracking(start_position)
+
+        next_move_func = heuristic_functions.get(
+            heuristic, self.warnsdorff_next_move)
+        return self._walk(start_position, next_move_func)
+
     def find_unreachable_squares(self):
         """Identifica todas as casas não visitadas no tabuleiro"""
         visited = set((x, y) for x, y in self.moves_history)
@@ -487,7 +902,7 @@ class AnimatedKnightTour:
 
         # Verifica todas as casas do tabuleiro
         for i in range(self.board_size):
-            for j in range(self.board_size):
+            for j in range(self.board_cols):
                 if (i, j) not in visited:
                     unreachable.append((i, j))
 
@@ -495,27 +910,461 @@ class AnimatedKnightTour:
         return unreachable
 
 
-def analyze_heuristics(board_size=8, start_position=(0, 0)):
-    """Analisa o desempenho de cada heurística"""
+def analyze_heuristics(board_size=8, start_position=(0, 0),
+                       time_budget=None, node_budget=None,
+                       board_cols=None, leaper=(1, 2)):
+    """Analisa o desempenho de cada heurística
+
+    Com time_budget/node_budget todas as heurísticas recebem o mesmo
+    orçamento, de modo que a cobertura é comparada a custo igual.
+    """
     results = {}
     heuristics = ["Warnsdorff", "Híbrida", "Neural", "Backtracking"]
 
     for heuristic in heuristics:
         start_time = time.time()
-        knight_tour = AnimatedKnightTour(board_size)
-        moves = knight_tour.solve_knights_tour(start_position, heuristic)
+        knight_tour = AnimatedKnightTour(
+            board_size, board_cols=board_cols, leaper=leaper)
+        moves = knight_tour.solve_knights_tour(
+            start_position, heuristic, time_budget, node_budget)
         end_time = time.time()
 
+        # Fração do orçamento consumida (o maior entre tempo e nós)
+        budget_usage = []
+        if time_budget:
+            budget_usage.append((end_time - start_time) / time_budget)
+        if node_budget:
+            budget_usage.append(knight_tour.nodes_expanded / node_budget)
+
         results[heuristic] = {
             "casas_visitadas": len(moves),
-            "cobertura": (len(moves) / (board_size ** 2)) * 100,
+            "cobertura": (len(moves) / knight_tour.board.size) * 100,
             "tempo_execucao": end_time - start_time,
-            "casas_nao_alcancaveis": len(knight_tour.find_unreachable_squares())
+            "casas_nao_alcancaveis": len(knight_tour.find_unreachable_squares()),
+            "nos_expandidos": knight_tour.nodes_expanded,
+            "uso_orcamento": min(max(budget_usage), 1.0) * 100 if budget_usage else np.nan,
+            "orcamento_esgotado": knight_tour.budget_exhausted
+        }
+
+    return results
+
+
+def _leads_to_dead_end(neighbor_masks, unvisited_neighbors, move, visited):
+    """Poda: verifica se ir para move isola alguma casa vizinha da posição atual
+
+    Uma casa sem ligações restantes nunca será visitada, e uma casa com uma
+    única ligação só pode ser a última do passeio - duas delas tornam o
+    passeio impossível.
+    """
+    forced_ends = 0
+    for square in unvisited_neighbors:
+        if square == move:
+            continue
+        links = (neighbor_masks[square] & ~visited).bit_count() + \
+            ((neighbor_masks[square] >> move) & 1)
+        if links == 0:
+            return True
+        if links == 1:
+            forced_ends += 1
+            if forced_ends > 1:
+                return True
+    return False
+
+
+def _enumerate_tours_dfs(neighbors, neighbor_masks, path, visited, total, tours):
+    """Busca em profundidade sobre bitmask; retorna (passeios, nós expandidos)"""
+    if len(path) == total:
+        if tours is not None:
+            tours.append(tuple(path))
+        return 1, 1
+
+    count = 0
+    nodes = 1
+    unvisited_neighbors = [square for square in neighbors[path[-1]]
+                           if not (visited >> square) & 1]
+    for move in unvisited_neighbors:
+        new_visited = visited | (1 << move)
+        if _leads_to_dead_end(neighbor_masks, unvisited_neighbors, move, new_visited):
+            continue
+
+        path.append(move)
+        sub_count, sub_nodes = _enumerate_tours_dfs(
+            neighbors, neighbor_masks, path, new_visited, total, tours)
+        path.pop()
+
+        count += sub_count
+        nodes += sub_nodes
+
+    return count, nodes
+
+
+def _enumerate_subtree(task):
+    """Executa a enumeração de uma subárvore (função de topo para os processos)"""
+    neighbors, neighbor_masks, prefix, collect_tours = task
+    visited = 0
+    for square in prefix:
+        visited |= 1 << square
+
+    tours = [] if collect_tours else None
+    count, nodes = _enumerate_tours_dfs(
+        neighbors, neighbor_masks, list(prefix), visited, len(neighbors), tours)
+    return prefix, count, nodes, tours
+
+
+class KnightTourEnumerator:
+    """Enumera exaustivamente os passeios do cavalo a partir de uma casa inicial
+
+    Pensado para tabuleiros pequenos (5x5 e 6x6), servindo como referência
+    para avaliar a cobertura das heurísticas. A árvore de busca é dividida
+    em subárvores independentes, executadas em processos separados. O
+    checkpoint é gravado no máximo a cada checkpoint_interval segundos e ao
+    final da execução.
+    """
+
+    def __init__(self, board_size=5, split_depth=4, workers=None,
+                 checkpoint_path=None, collect_tours=False,
+                 board_cols=None, leaper=(1, 2), checkpoint_interval=30.0):
+        self.board_size = board_size
+        self.board_cols = board_cols or board_size
+        self.leaper = tuple(leaper)
+        self.split_depth = split_depth
+        self.workers = workers
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.collect_tours = collect_tours
+
+        # Tabelas de vizinhos e simetrias do cache de geometrias
+        geometry = get_leaper_geometry(
+            self.board_size, self.board_cols, *self.leaper)
+        self.neighbors = geometry.neighbor_indices
+        self.neighbor_masks = geometry.neighbor_masks
+        self.symmetries = geometry.symmetries
+
+    def _split_into_subtrees(self, start_index, stabilizer):
+        """Gera os prefixos de subárvore, um representante por órbita de simetria
+
+        Retorna um dicionário prefixo -> tamanho da órbita; os passeios de
+        prefixos simétricos são contados uma única vez e multiplicados.
+        """
+        total = len(self.neighbors)
+        depth = max(0, min(self.split_depth, total - 2))
+        prefixes = []
+
+        def expand(path, visited):
+            if len(path) == depth + 1:
+                prefixes.append(tuple(path))
+                return
+            unvisited_neighbors = [square for square in self.neighbors[path[-1]]
+                                   if not (visited >> square) & 1]
+            for move in unvisited_neighbors:
+                new_visited = visited | (1 << move)
+                if _leads_to_dead_end(self.neighbor_masks, unvisited_neighbors,
+                                      move, new_visited):
+                    continue
+                path.append(move)
+                expand(path, new_visited)
+                path.pop()
+
+        expand([start_index], 1 << start_index)
+
+        representatives = {}
+        for prefix in prefixes:
+            images = {tuple(permutation[square] for square in prefix)
+                      for permutation in stabilizer}
+            representatives[min(images)] = len(images)
+        return representatives
+
+    def _load_checkpoint(self, start_position):
+        """Carrega as subárvores já concluídas de uma execução anterior"""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return {}
+
+        with open(self.checkpoint_path) as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+
+        if (checkpoint["board_size"] != self.board_size or
+                checkpoint.get("board_cols", checkpoint["board_size"]) != self.board_cols or
+                tuple(checkpoint.get("leaper", (1, 2))) != self.leaper or
+                tuple(checkpoint["start_position"]) != tuple(start_position) or
+                checkpoint["split_depth"] != self.split_depth or
+                checkpoint["collect_tours"] != self.collect_tours):
+            raise ValueError(
+                "Checkpoint pertence a outra configuração de enumeração!")
+
+        return {tuple(entry["prefix"]): entry for entry in checkpoint["completed"]}
+
+    def _save_checkpoint(self, start_position, completed):
+        """Grava o checkpoint de forma atômica para permitir retomar a enumeração"""
+        if not self.checkpoint_path:
+            return
+
+        checkpoint = {
+            "board_size": self.board_size,
+            "board_cols": self.board_cols,
+            "leaper": list(self.leaper),
+            "start_position": list(start_position),
+            "split_depth": self.split_depth,
+            "collect_tours": self.collect_tours,
+            "completed": list(completed.values())
+        }
+        temp_path = self.checkpoint_path + ".tmp"
+        with open(temp_path, "w") as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def enumerate_tours(self, start_position, progress_callback=None):
+        """Conta (e opcionalmente lista) todos os passeios a partir de start_position
+
+        passeios_por_segundo mede só as subárvores concluídas nesta execução;
+        é None quando todas foram retomadas do checkpoint.
+        """
+        cols = self.board_cols
+        start_index = start_position[0] * cols + start_position[1]
+        stabilizer = [permutation for permutation in self.symmetries
+                      if permutation[start_index] == start_index]
+
+        subtrees = self._split_into_subtrees(start_index, stabilizer)
+        completed = {prefix: entry
+                     for prefix, entry in self._load_checkpoint(start_position).items()
+                     if prefix in subtrees}
+        resumed = len(completed)
+        pending = [prefix for prefix in subtrees if prefix not in completed]
+
+        start_time = time.time()
+        last_save = start_time
+        new_tours = 0
+        tasks = [(self.neighbors, self.neighbor_masks, prefix, self.collect_tours)
+                 for prefix in pending]
+
+        def record(prefix, count, nodes, tours):
+            nonlocal new_tours, last_save
+            completed[prefix] = {"prefix": list(prefix), "count": count,
+                                 "nodes": nodes, "tours": tours}
+            new_tours += count * subtrees[prefix]
+
+            # Regravar o estado inteiro a cada subárvore custaria O(n²) em E/S
+            if time.time() - last_save >= self.checkpoint_interval:
+                self._save_checkpoint(start_position, completed)
+                last_save = time.time()
+            if progress_callback:
+                progress_callback(len(completed), len(subtrees))
+
+        try:
+            if self.workers == 1:
+                for task in tasks:
+                    record(*_enumerate_subtree(task))
+            else:
+                with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                    futures = [executor.submit(_enumerate_subtree, task)
+                               for task in tasks]
+                    for future in as_completed(futures):
+                        record(*future.result())
+        finally:
+            # Grava também quando a execução é interrompida
+            if pending:
+                self._save_checkpoint(start_position, completed)
+
+        elapsed = time.time() - start_time
+
+        all_tours = None
+        if self.collect_tours:
+            # Reconstrói os passeios das órbitas aplicando as simetrias
+            all_tours = set()
+            for entry in completed.values():
+                for tour in entry["tours"]:
+                    for permutation in stabilizer:
+                        all_tours.add(tuple(
+                            divmod(permutation[square], cols) for square in tour))
+            all_tours = sorted(all_tours)
+
+        return {
+            "tamanho_tabuleiro": self.board_size,
+            "colunas_tabuleiro": cols,
+            "peca": self.leaper,
+            "posicao_inicial": tuple(start_position),
+            "total_passeios": sum(entry["count"] * subtrees[prefix]
+                                  for prefix, entry in completed.items()),
+            "subarvores": len(subtrees),
+            "subarvores_retomadas": resumed,
+            "nos_expandidos": sum(entry["nodes"] for entry in completed.values()),
+            "tempo_execucao": elapsed,
+            "passeios_novos": new_tours,
+            "passeios_por_segundo": (new_tours / elapsed if elapsed > 0 else 0.0)
+            if pending else None,
+            "passeios": all_tours
+        }
+
+
+def grade_heuristics_coverage(board_size=5, start_position=(0, 0), enumeration=None,
+                              board_cols=None, leaper=(1, 2), neural_network=None):
+    """Avalia a cobertura das heurísticas contra a enumeração exaustiva
+
+    neural_network é a rede treinada usada pela Neural; sem ela a Neural
+    recai na Híbrida.
+    """
+    if enumeration is None:
+        enumeration = KnightTourEnumerator(
+            board_size, board_cols=board_cols, leaper=leaper).enumerate_tours(start_position)
+
+    tour_exists = enumeration["total_passeios"] > 0
+    results = {}
+    for heuristic in ["Warnsdorff", "Híbrida", "Neural", "Backtracking"]:
+        knight_tour = AnimatedKnightTour(
+            board_size, board_cols=board_cols, leaper=leaper)
+        if heuristic == "Neural" and neural_network is not None:
+            knight_tour.neural_network = neural_network
+        moves = knight_tour.solve_knights_tour(start_position, heuristic)
+        complete = len(moves) == knight_tour.board.size
+        results[heuristic] = {
+            "cobertura": (len(moves) / knight_tour.board.size) * 100,
+            "passeio_completo": complete,
+            "passeio_existe": tour_exists,
+            "falhou_com_solucao": tour_exists and not complete
         }
 
     return results
 
 
+def _evaluate_hybrid_candidate(task):
+    """Mede o tamanho dos passeios da Híbrida para um vetor de pesos (processo)"""
+    weights, leaper, evaluations = task
+    lengths = []
+    for board_size, board_cols, start_position in evaluations:
+        knight_tour = AnimatedKnightTour(
+            board_size, hybrid_weights=weights, board_cols=board_cols, leaper=leaper)
+        lengths.append(len(knight_tour.solve_knights_tour(
+            start_position, "Híbrida")))
+    return weights, evaluations, lengths
+
+
+class HybridWeightTuner:
+    """Otimiza os pesos da heurística Híbrida por busca evolutiva
+
+    Cada candidato é avaliado em todas as casas iniciais dos tabuleiros
+    escolhidos (um inteiro para quadrados ou uma tupla (linhas, colunas));
+    as avaliações rodam em processos paralelos e são memorizadas por
+    (pesos, tabuleiro, casa inicial).
+    """
+
+    def __init__(self, board_sizes=(8,), population_size=16, generations=10,
+                 mutation_scale=0.1, workers=None, seed=42, leaper=(1, 2)):
+        self.board_sizes = [(size, size) if isinstance(size, int) else tuple(size)
+                            for size in board_sizes]
+        self.leaper = tuple(leaper)
+        self.population_size = population_size
+        self.generations = generations
+        self.mutation_scale = mutation_scale
+        self.workers = workers
+        self.rng = np.random.default_rng(seed)
+
+        self.evaluations = [(board_size, board_cols, (x, y))
+                            for board_size, board_cols in self.board_sizes
+                            for x in range(board_size)
+                            for y in range(board_cols)]
+        self.cache = {}
+        self.cache_hits = 0
+        self.best_weights = DEFAULT_HYBRID_WEIGHTS
+        self.best_fitness = -1.0
+        self.history = []
+
+    def _normalize(self, weights):
+        """Escala os pesos para soma absoluta 1, arredondados para o cache
+
+        Pesos negativos são permitidos: acessibilidade negativa, por
+        exemplo, aproxima a Híbrida da regra de Warnsdorff.
+        """
+        weights = np.asarray(weights, dtype=float)
+        if np.abs(weights).sum() == 0:
+            weights = np.ones(3)
+        return tuple(float(w) for w in
+                     np.round(weights / np.abs(weights).sum(), 3))
+
+    def _mutate(self, weights):
+        """Perturba um vetor de pesos com ruído gaussiano"""
+        return self._normalize(
+            np.array(weights) + self.rng.normal(0, self.mutation_scale, 3))
+
+    def _evaluate_population(self, population, executor):
+        """Calcula a cobertura média de cada candidato, reaproveitando o cache"""
+        tasks = {}
+        for weights in population:
+            missing = [evaluation for evaluation in self.evaluations
+                       if (weights, *evaluation) not in self.cache]
+            self.cache_hits += len(self.evaluations) - len(missing)
+            if missing and weights not in tasks:
+                tasks[weights] = missing
+
+        tasks = [(weights, self.leaper, missing)
+                 for weights, missing in tasks.items()]
+        if executor is None:
+            results = map(_evaluate_hybrid_candidate, tasks)
+        else:
+            results = executor.map(_evaluate_hybrid_candidate, tasks)
+
+        for weights, evaluations, lengths in results:
+            for evaluation, length in zip(evaluations, lengths):
+                self.cache[(weights, *evaluation)] = length
+
+        return [float(np.mean([self.cache[(weights, *evaluation)] /
+                               (evaluation[0] * evaluation[1])
+                               for evaluation in self.evaluations]))
+                for weights in population]
+
+    def tune(self, progress_callback=None):
+        """Executa a busca e retorna os melhores pesos e sua cobertura média"""
+        population = [DEFAULT_HYBRID_WEIGHTS] + [
+            self._normalize(self.rng.uniform(-1, 1, 3))
+            for _ in range(self.population_size - 1)]
+        elite_size = max(2, self.population_size // 4)
+
+        executor = None
+        if self.workers != 1:
+            executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        try:
+            for generation in range(self.generations):
+                fitness = self._evaluate_population(population, executor)
+                ranked = sorted(zip(fitness, population), reverse=True)
+
+                if ranked[0][0] > self.best_fitness:
+                    self.best_fitness, self.best_weights = ranked[0]
+                self.history.append(self.best_fitness)
+                if progress_callback:
+                    progress_callback(generation + 1, self.generations)
+
+                # Mantém a elite e completa a população com mutações dela
+                elites = [weights for _, weights in ranked[:elite_size]]
+                population = elites + [
+                    self._mutate(elites[self.rng.integers(len(elites))])
+                    for _ in range(self.population_size - elite_size)]
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        return {
+            "pesos": self.best_weights,
+            "cobertura_media": self.best_fitness * 100,
+            "avaliacoes": len(self.cache),
+            "acertos_cache": self.cache_hits
+        }
+
+    def save_best_weights(self, path=HYBRID_WEIGHTS_PATH):
+        """Grava os melhores pesos para os tabuleiros e a peça otimizados
+
+        Entradas de outros tabuleiros e peças já gravadas são preservadas.
+        """
+        accessibility, edge, center = self.best_weights
+        weights_by_board = dict(_read_hybrid_weights_file(path))
+        for board_size, board_cols in self.board_sizes:
+            weights_by_board[_hybrid_weights_key(board_size, board_cols, self.leaper)] = {
+                "acessibilidade": accessibility, "distancia_borda": edge,
+                "distancia_centro": center}
+
+        with open(path, "w") as weights_file:
+            json.dump(weights_by_board, weights_file, indent=2)
+        _read_hybrid_weights_file.cache_clear()
+
+
 def get_heuristic_conclusion(df):
     """Gera conclusão dinâmica baseada nos resultados reais"""
     best_coverage = df["Cobertura (%)"].max()
@@ -556,6 +1405,16 @@ def get_heuristic_conclusion(df):
     return conclusion
 
 
+def attach_session_network(knight_tour):
+    """Usa a rede treinada na sessão se o tabuleiro couber na entrada 8x8 da rede"""
+    network = st.session_state.get("neural_network")
+    if network is None or knight_tour.board_size > 8 or knight_tour.board_cols > 8:
+        return False
+
+    knight_tour.neural_network = network
+    return True
+
+
 def main():
     st.title("Passeio do Cavalo Animado")
 
@@ -598,6 +1457,14 @@ def main():
     # Adiciona seleção de tamanho do tabuleiro
     board_size = st.sidebar.slider(
         "Tamanho do tabuleiro:", min_value=8, max_value=16, value=8)
+    board_cols = board_size
+    if st.sidebar.checkbox("Tabuleiro retangular"):
+        board_cols = st.sidebar.slider(
+            "Número de colunas:", min_value=5, max_value=16, value=board_size)
+
+    # Adiciona seleção da peça saltadora (a, b)
+    piece = st.sidebar.selectbox("Peça:", list(LEAPERS))
+    leaper = LEAPERS[piece]
 
     # Adiciona seleção de heurística
     heuristic = st.sidebar.selectbox(
@@ -608,34 +1475,74 @@ def main():
     # Mostra explicação da heurística selecionada
     if st.sidebar.checkbox("Mostrar explicação da heurística"):
         st.sidebar.markdown("### Explicação da Heurística Selecionada")
-        st.sidebar.markdown(get_heuristic_explanation(heuristic))
+        st.sidebar.markdown(get_heuristic_explanation(
+            heuristic, load_hybrid_weights(board_size, board_cols, leaper)))
 
     # Botão para treinar rede neural (só aparece quando Neural está selecionado)
     if heuristic == "Neural":
         if st.sidebar.button("Treinar Rede Neural"):
             with st.spinner("Treinando rede neural... Isso pode demorar alguns minutos."):
-                knight_tour = AnimatedKnightTour(board_size)
+                # A rede tem entrada 8x8, então treina sempre em um tabuleiro 8x8
+                knight_tour = AnimatedKnightTour(8)
                 knight_tour.train_neural_network(
                     num_games=500)  # Reduzido para teste
+                # Guarda a rede para os passeios e a varredura de cobertura
+                st.session_state["neural_network"] = knight_tour.neural_network
                 st.sidebar.success("Rede neural treinada com sucesso!")
 
+    # Botão para otimizar os pesos (só aparece quando Híbrida está selecionada)
+    if heuristic == "Híbrida":
+        if st.sidebar.button("Otimizar Pesos da Híbrida"):
+            with st.spinner("Otimizando pesos da heurística Híbrida..."):
+                tuner = HybridWeightTuner(
+                    board_sizes=((board_size, board_cols),), leaper=leaper)
+                tuning = tuner.tune()
+                tuner.save_best_weights()
+                st.sidebar.success(
+                    f"Pesos otimizados para {board_size}x{board_cols} com {piece} "
+                    f"(acessibilidade, bordas, centro): {tuning['pesos']} - "
+                    f"cobertura média {tuning['cobertura_media']:.1f}%")
+
     start_x = st.sidebar.selectbox(
-        "Posição inicial X (coluna):", range(board_size))
+        "Posição inicial X (coluna):", range(board_cols))
     start_y = st.sidebar.selectbox(
         "Posição inicial Y (linha):", range(board_size))
     animation_speed = st.sidebar.slider(
         "Velocidade da animação (ms)", 100, 1000, 500)
+    render_mode = st.sidebar.radio(
+        "Renderização da animação:",
+        ["Navegador (SVG)", "Servidor (imagens PNG)"])
+
+    # Orçamento de computação por passeio (0 = sem limite)
+    time_budget = st.sidebar.number_input(
+        "Orçamento de tempo por passeio (s, 0 = sem limite)",
+        min_value=0.0, max_value=60.0, value=0.0, step=0.5)
+    node_budget = st.sidebar.number_input(
+        "Orçamento de nós por passeio (0 = sem limite)",
+        min_value=0, max_value=10_000_000, value=0, step=10_000)
+    time_budget = time_budget or None
+    node_budget = int(node_budget) or None
 
     if st.sidebar.button("Iniciar Passeio do Cavalo"):
-        knight_tour = AnimatedKnightTour(board_size)
-        start_position = (7 - start_y, start_x)
-        moves = knight_tour.solve_knights_tour(start_position, heuristic)
+        knight_tour = AnimatedKnightTour(
+            board_size, board_cols=board_cols, leaper=leaper)
+        if not attach_session_network(knight_tour) and heuristic == "Neural" and \
+                "neural_network" in st.session_state:
+            st.info("A rede neural cobre apenas tabuleiros de até 8x8: "
+                    "a Neural usa a heurística Híbrida como fallback.")
+        start_position = (board_size - 1 - start_y, start_x)
+        moves = knight_tour.solve_knights_tour(
+            start_position, heuristic, time_budget, node_budget)
+
+        if knight_tour.budget_exhausted:
+            st.warning(
+                "Orçamento esgotado: exibindo o melhor passeio encontrado até o momento.")
 
         # Encontra casas não alcançáveis
         unreachable = knight_tour.find_unreachable_squares()
 
         # Atualiza métricas
-        total_squares = board_size * board_size
+        total_squares = board_size * board_cols
         visited_squares = len(moves)
         unvisited_squares = len(unreachable)
         coverage = (visited_squares / total_squares) * 100
@@ -654,17 +1561,23 @@ def main():
         st.write(
             f"Iniciando na posição: {chess_column}{chess_row} (X={start_x}, Y={start_y})")
 
-        # Cria as imagens para animação
-        frames = knight_tour.create_animation(moves)
-
         # Mostra a animação
         st.subheader("Animação do Passeio do Cavalo")
-        placeholder = st.empty()
 
-        # Executa a animação uma única vez
-        for frame in frames:
-            placeholder.image(frame)
-            time.sleep(animation_speed / 1000)
+        if render_mode == "Navegador (SVG)":
+            # Envia só a lista de movimentos; o navegador anima localmente
+            components.html(
+                knight_tour.create_animation_html(moves, animation_speed),
+                height=(board_size + 1) * 48 + 60)
+        else:
+            # Cria as imagens para animação
+            frames = knight_tour.create_animation(moves)
+            placeholder = st.empty()
+
+            # Executa a animação uma única vez
+            for frame in frames:
+                placeholder.image(frame)
+                time.sleep(animation_speed / 1000)
 
         # Adiciona explicação detalhada
         st.markdown(f"""
@@ -677,14 +1590,33 @@ def main():
 
     if st.checkbox("Mostrar análise comparativa das heurísticas"):
         st.subheader("Análise Comparativa das Heurísticas")
-        results = analyze_heuristics(board_size, (7 - start_y, start_x))
+        results = analyze_heuristics(
+            board_size, (board_size - 1 - start_y, start_x), time_budget, node_budget,
+            board_cols, leaper)
 
         # Cria tabela comparativa
         df = pd.DataFrame(results).T
         df.columns = ["Casas Visitadas",
-                      "Cobertura (%)", "Tempo (s)", "Casas Não Alcançáveis"]
+                      "Cobertura (%)", "Tempo (s)", "Casas Não Alcançáveis",
+                      "Nós Expandidos", "Uso do Orçamento (%)",
+                      "Orçamento Esgotado"]
+        if time_budget is None and node_budget is None:
+            df = df.drop(columns=["Uso do Orçamento (%)", "Orçamento Esgotado"])
         st.table(df)
 
+        # Descreve a profundidade do Backtracking conforme o modo de execução
+        if time_budget is None and node_budget is None:
+            backtracking_depth = "Busca exaustiva com profundidade limitada (3 níveis)"
+        else:
+            backtracking_depth = (
+                "Com orçamento: repete o passeio com profundidade crescente (1, 2, 3, ...) "
+                "e mantém o mais longo; orçamentos pequenos podem gerar passeios mais "
+                "curtos que a versão sem orçamento (3 níveis)")
+
+        # A conclusão compara apenas as métricas de qualidade e tempo
+        df = df[["Casas Visitadas", "Cobertura (%)", "Tempo (s)",
+                 "Casas Não Alcançáveis"]].astype(float)
+
         # Análise dos resultados
         st.markdown(f"""
         ### Análise dos Resultados:
@@ -712,7 +1644,7 @@ def main():
             - Requer treinamento prévio para funcionar adequadamente
         
         - **Backtracking:**
-            - Busca exaustiva com profundidade limitada (3 níveis)
+            - {backtracking_depth}
             - Garantia de encontrar solução se existir
             - Tempo de execução MUITO alto devido à análise profunda e complexa
             - Consome muitos recursos computacionais - agora é realmente mais lento
@@ -722,9 +1654,78 @@ def main():
         {get_heuristic_conclusion(df)}
         """)
 
-
-def get_heuristic_explanation(heuristic):
+    if st.checkbox("Cobertura da Neural a partir de todas as casas iniciais"):
+        st.subheader("Cobertura da Heurística Neural por Casa Inicial")
+        knight_tour = AnimatedKnightTour(
+            board_size, board_cols=board_cols, leaper=leaper)
+        if not attach_session_network(knight_tour):
+            st.info("Rede neural não treinada ou tabuleiro maior que 8x8: "
+                    "a Neural usa a heurística Híbrida como fallback.")
+
+        # Todos os passeios avançam juntos, com um forward da rede por passo
+        starts = [(x, y) for x in range(board_size) for y in range(board_cols)]
+        paths = knight_tour.solve_neural_tours_batch(starts)
+        coverage = np.zeros((board_size, board_cols))
+        for (x, y), path in zip(starts, paths):
+            coverage[x, y] = len(path) / (board_size * board_cols) * 100
+
+        st.metric("Cobertura média", f"{coverage.mean():.1f}%")
+        df_coverage = pd.DataFrame(
+            coverage,
+            index=[f"Y={board_size - 1 - x}" for x in range(board_size)],
+            columns=[f"X={y}" for y in range(board_cols)])
+        st.dataframe(df_coverage.round(1))
+
+    if st.checkbox("Enumeração exaustiva dos passeios (tabuleiros 5x5 e 6x6)"):
+        st.subheader("Enumeração Exaustiva dos Passeios")
+        enum_size = st.selectbox("Tamanho do tabuleiro para enumeração:", [5, 6])
+        col1, col2 = st.columns(2)
+        with col1:
+            enum_x = st.selectbox("Posição inicial X (coluna):",
+                                  range(enum_size), key="enum_x")
+        with col2:
+            enum_y = st.selectbox("Posição inicial Y (linha):",
+                                  range(enum_size), key="enum_y")
+        max_workers = os.cpu_count() or 1
+        workers = 1
+        if max_workers > 1:
+            workers = st.slider("Processos paralelos:", 1, max_workers, max_workers)
+
+        if st.button("Enumerar passeios"):
+            enum_start = (enum_size - 1 - enum_y, enum_x)
+            progress = st.progress(0.0)
+
+            # O checkpoint permite retomar uma enumeração interrompida
+            enumerator = KnightTourEnumerator(
+                enum_size, workers=workers,
+                checkpoint_path=f"enumeracao_{enum_size}x{enum_size}_{enum_x}_{enum_y}.json")
+            enumeration = enumerator.enumerate_tours(
+                enum_start, lambda done, total: progress.progress(done / total))
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric("Passeios encontrados", enumeration["total_passeios"])
+            with col2:
+                tours_per_second = enumeration["passeios_por_segundo"]
+                st.metric("Passeios por segundo (nesta execução)",
+                          "—" if tours_per_second is None else f"{tours_per_second:.0f}")
+            with col3:
+                st.metric("Subárvores (retomadas)",
+                          f"{enumeration['subarvores']} ({enumeration['subarvores_retomadas']})")
+
+            # Compara as heurísticas com a referência exata
+            grades = grade_heuristics_coverage(
+                enum_size, enum_start, enumeration,
+                neural_network=st.session_state.get("neural_network"))
+            df_grades = pd.DataFrame(grades).T
+            df_grades.columns = ["Cobertura (%)", "Passeio Completo",
+                                 "Passeio Existe", "Falhou com Solução Existente"]
+            st.table(df_grades)
+
+
+def get_heuristic_explanation(heuristic, hybrid_weights=DEFAULT_HYBRID_WEIGHTS):
     """Retorna explicação detalhada da heurística utilizada baseada no arquivo HTML"""
+    accessibility_weight, edge_weight, center_weight = hybrid_weights
     explanations = {
         "Warnsdorff": """
         **Heurística Inteligente de Warnsdorff:**
@@ -735,13 +1736,14 @@ def get_heuristic_explanation(heuristic):
         - **Desvantagens:** Não garante solução em todos os tabuleiros, baseada em estratégia gulosa
         - **Melhor para:** Tabuleiros menores (8x8) onde a probabilidade de sucesso é alta
         """,
-        "Híbrida": """
+        "Híbrida": f"""
         **Heurística Híbrida com Características Múltiplas:**
         
         Considera múltiplos fatores para tomar decisões inteligentes:
-        - **Acessibilidade:** Número de movimentos futuros disponíveis (60% do score)
-        - **Distância do Centro:** Prefere posições centrais para manter flexibilidade (10% do score)
-        - **Distância das Bordas:** Evita cantos e bordas para maximizar opções (30% do score)
+        - **Acessibilidade:** Número de movimentos futuros disponíveis (peso {accessibility_weight:.3g})
+        - **Distância do Centro:** Prefere posições centrais para manter flexibilidade (peso {center_weight:.3g})
+        - **Distância das Bordas:** Evita cantos e bordas para maximizar opções (peso {edge_weight:.3g})
+        - **Pesos:** O padrão é 0.6/0.1/0.3 (60%, 10% e 30% do score); o botão "Otimizar Pesos da Híbrida" ajusta os pesos para cada tabuleiro e peça
         - **Vantagens:** Boa adaptabilidade, combina heurísticas tradicionais de forma inteligente
         - **Aplicação:** Sistema baseado em regras com pesos otimizados
         """,
@@ -759,6 +1761,7 @@ def get_heuristic_explanation(heuristic):
         **Busca Exaustiva com Profundidade Limitada - Versão Realista:**
         
         Explora sistematicamente possíveis caminhos com profundidade limitada a 3 níveis:
+        - **Com orçamento de tempo/nós:** Repete o passeio com profundidade crescente (1, 2, 3, ...) e mantém o mais longo encontrado; orçamentos pequenos podem gerar passeios mais curtos que a versão sem orçamento
         - **Garantia:** Encontra solução se ela existir (maior confiabilidade)
         - **Estratégia:** Análise profunda com análise de conectividade e qualidade futura
         - **Complexidade:** Análise de múltiplas camadas de movimentos futuros